@@ -6,6 +6,7 @@ from typing import Any
 from uuid import uuid4
 
 import httpx
+import orjson
 
 from a2a.client import A2ACardResolver, A2AClient
 from a2a.types import (
@@ -52,7 +53,7 @@ async def main(base_url: str, query: str) -> None:
         )
 
         response = await client.send_message(request)
-        print(response.model_dump(mode='json', exclude_none=True))
+        print(orjson.dumps(response.model_dump(mode='json', exclude_none=True)).decode())
 
 @click.command()
 @click.option('--url', default='https://weather-agent-937447787060.us-central1.run.app', help='The base URL of the weather agent.')
@@ -1,80 +1,182 @@
 
 import os
-import json
+import re
 import asyncio
-from typing import Any, Dict, List, Literal
-from collections.abc import AsyncIterable
-
-from langchain_core.messages import AIMessage, ToolMessage
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_openai import ChatOpenAI
-from langgraph.checkpoint.memory import MemorySaver
-from langgraph.prebuilt import create_react_agent
+import threading
+from typing import TYPE_CHECKING, Any, Dict, List, Literal
+from collections.abc import AsyncIterable, Awaitable, Callable
+
+from langchain_core.messages import (
+    AIMessage,
+    AIMessageChunk,
+    HumanMessage,
+    SystemMessage,
+    ToolMessage,
+)
 from pydantic import BaseModel
-from langchain.tools import Tool
-from fastmcp import Client
+from cachetools import TTLCache
+import orjson
+
+# LangGraph, fastmcp and the model vendor SDKs are imported where they are
+# first used, so startup only pays for the vendor that is actually selected.
+if TYPE_CHECKING:
+    from fastmcp import Client
+    from langchain.tools import Tool
+
+# Final replies that ask the user something, request more input or report a
+# failure still need the structured-output pass to decide between
+# input_required and error.
+_NEEDS_STATUS_CHECK = re.compile(
+    r"\?\s*$"
+    r"|\b(error|unable|could not|couldn't|cannot|can't)\b"
+    r"|\b(please (provide|specify|tell|clarify|confirm)|let me know|which one)\b",
+    re.IGNORECASE,
+)
+
+# All MCP traffic runs on one persistent event loop in a background thread,
+# so sync LangChain tools can submit coroutines without nesting event loops.
+_loop = asyncio.new_event_loop()
+threading.Thread(target=_loop.run_forever, daemon=True).start()
 
+# Recent tool results, keyed by tool name and then by normalized arguments.
+# Only touched from the MCP loop thread, so no locking is needed.
+# The MCP server caches OpenWeatherMap data too and these TTLs stack on top of
+# its own, so they are kept short: only enough to absorb repeated calls.
+_TOOL_CACHE_TTL = {'get_current_weather': 10, 'get_weather_forecast': 300}
+_tool_caches: Dict[str, TTLCache] = {}
 
-import nest_asyncio
-nest_asyncio.apply()
+# MCP call timeout: above the MCP server's 15 s OpenWeatherMap retry budget, so
+# its retries can still answer the call, and inside the 30 s budget of the tool
+# wrappers below.
+_MCP_CALL_TIMEOUT = 20.0
 
 
-memory = MemorySaver()
+async def mcp_tools(
+    get_client: Callable[[], Awaitable['Client']],
+    reset_client: Callable[['Client'], Awaitable[None]],
+) -> List['Tool']:
+    """Discover tools from an MCP server and create LangChain tools.
 
+    Tool calls go through the long-lived client returned by ``get_client``
+    instead of opening a new MCP session for every call. A call that loses
+    its session hands the client to ``reset_client`` so the next call
+    reconnects; it is retried once only if the request was never sent.
+    """
+    import anyio
+    import httpx
+    from langchain.tools import Tool
 
-async def mcp_tools(mcp_server_url: str) -> List[Tool]:
-    """Discover tools from an MCP server and create LangChain tools."""
+    # Raised by the session's write stream once the transport has shut down,
+    # before the request leaves the client.
+    not_sent_errors = (anyio.ClosedResourceError, anyio.BrokenResourceError)
 
     async def discover_mcp_tools():
         """Discover available tools from MCP server"""
         try:
-            async with Client(mcp_server_url, timeout=30.0) as client:
-                tools = await client.list_tools()
-                if not tools:
-                    raise Exception("No tools found on MCP server.")
-                return tools
+            client = await get_client()
+            tools = await client.list_tools()
+            if not tools:
+                raise Exception("No tools found on MCP server.")
+            return tools
         except Exception as e:
             raise Exception(f"Failed to connect to MCP server: {e}")
 
-    def call_mcp_tool_sync(tool_name: str, arguments: Dict[str, Any]) -> str:
-        """Synchronous wrapper for MCP tool calls"""
-        async def _call_mcp_tool():
+    async def _call_mcp_tool(tool_name: str, arguments: Dict[str, Any]) -> str:
+        """Call an MCP tool on the shared client (runs on the MCP loop)"""
+        cache = _tool_caches.get(tool_name)
+        if cache is None:
+            cache = _tool_caches[tool_name] = TTLCache(
+                maxsize=1024, ttl=_TOOL_CACHE_TTL.get(tool_name, 300)
+            )
+        key = orjson.dumps(arguments, option=orjson.OPT_SORT_KEYS)
+        if key in cache:
+            return cache[key]
+
+        for attempt in range(2):
             try:
-                async with Client(mcp_server_url, timeout=30.0) as client:
-                    result = await client.call_tool(tool_name, arguments)
-                    if result.content and len(result.content) > 0:
-                        return result.content[0].text
-                    else:
-                        return f"No result from {tool_name}"
+                client = await get_client()
             except Exception as e:
                 return f"Error calling {tool_name}: {str(e)}"
+            try:
+                result = await client.call_tool(
+                    tool_name,
+                    arguments,
+                    timeout=_MCP_CALL_TIMEOUT,
+                    raise_on_error=False,
+                )
+                break
+            except Exception as e:
+                # Only a lost session (e.g. the MCP server restarted) is
+                # dropped; a plain timeout leaves the shared session, and the
+                # other calls in flight on it, alone.
+                lost = isinstance(e, (*not_sent_errors, httpx.TransportError))
+                if lost or not client.is_connected():
+                    await reset_client(client)
+                # A request that may have reached the server is not re-run.
+                if attempt or not isinstance(e, not_sent_errors):
+                    return f"Error calling {tool_name}: {str(e)}"
+
+        if result.content and len(result.content) > 0:
+            text = result.content[0].text
+            # Failed tool calls are reported, never cached.
+            if result.is_error:
+                return f"Error calling {tool_name}: {text}"
+            cache[key] = text
+            return text
+        else:
+            return f"No result from {tool_name}"
+
+    def call_mcp_tool_sync(tool_name: str, arguments: Dict[str, Any]) -> str:
+        """Synchronous wrapper for MCP tool calls"""
+        fut = asyncio.run_coroutine_threadsafe(
+            _call_mcp_tool(tool_name, arguments), _loop
+        )
+        try:
+            return fut.result(timeout=30)
+        except TimeoutError:
+            fut.cancel()
+            return f"Error calling {tool_name}: timed out"
 
+    async def call_mcp_tool_async(tool_name: str, arguments: Dict[str, Any]) -> str:
+        """Asynchronous wrapper for MCP tool calls"""
+        fut = asyncio.run_coroutine_threadsafe(
+            _call_mcp_tool(tool_name, arguments), _loop
+        )
         try:
-            loop = asyncio.get_event_loop()
-            if loop.is_running():
-                return loop.run_until_complete(_call_mcp_tool())
-            else:
-                return asyncio.run(_call_mcp_tool())
-        except:
-            return asyncio.run(_call_mcp_tool())
+            return await asyncio.wait_for(asyncio.wrap_future(fut), timeout=30)
+        except TimeoutError:
+            return f"Error calling {tool_name}: timed out"
+
+    def parse_tool_input(tool_input: str) -> Dict[str, Any]:
+        """Turn the LLM's tool input into MCP tool arguments"""
+        # Most inputs are a bare location name, so only try JSON for objects.
+        if tool_input[:1] == '{':
+            try:
+                arguments = orjson.loads(tool_input)
+            except orjson.JSONDecodeError:
+                arguments = None
+            if isinstance(arguments, dict):
+                return arguments
+            return {"location": tool_input.strip()}
+        if tool_input and (tool_input[0].isspace() or tool_input[-1].isspace()):
+            return {"location": tool_input.strip()}
+        return {"location": tool_input}
 
     def create_langchain_tool(mcp_tool):
         """Create a LangChain tool from an MCP tool"""
         def tool_function(tool_input: str) -> str:
-            try:
-                if tool_input.startswith('{') and tool_input.endswith('}'):
-                    arguments = json.loads(tool_input)
-                else:
-                    arguments = {"location": tool_input.strip()}
-            except json.JSONDecodeError:
-                arguments = {"location": tool_input.strip()}
-            
+            arguments = parse_tool_input(tool_input)
             return call_mcp_tool_sync(mcp_tool.name, arguments)
-        
+
+        async def async_tool_function(tool_input: str) -> str:
+            arguments = parse_tool_input(tool_input)
+            return await call_mcp_tool_async(mcp_tool.name, arguments)
+
         return Tool(
             name=mcp_tool.name,
             description=mcp_tool.description or f"MCP tool: {mcp_tool.name}",
-            func=tool_function
+            func=tool_function,
+            coroutine=async_tool_function,
         )
 
     discovered_tools = await discover_mcp_tools()
@@ -88,6 +190,16 @@ class ResponseFormat(BaseModel):
     message: str
 
 
+def _called_tool_this_turn(messages: List[Any]) -> bool:
+    """Return True if a tool result follows the latest user message."""
+    for message in reversed(messages):
+        if isinstance(message, ToolMessage):
+            return True
+        if isinstance(message, HumanMessage):
+            return False
+    return False
+
+
 class WeatherAgent:
     """WeatherAgent - a specialized assistant for weather information."""
 
@@ -106,61 +218,154 @@ class WeatherAgent:
     )
 
     def __init__(self, mcp_server_url: str):
+        """Store configuration only; use create() or await setup() before streaming."""
+        self.mcp_server_url = mcp_server_url
+        self._mcp_client: 'Client | None' = None
+        self._mcp_client_lock = asyncio.Lock()
+
+        self.model = None
+        self.tools: List['Tool'] = []
+        self.graph = None
+
+    @classmethod
+    async def create(cls, mcp_server_url: str) -> 'WeatherAgent':
+        """Create a WeatherAgent that is ready to stream."""
+        agent = cls(mcp_server_url)
+        await agent.setup()
+        return agent
+
+    async def setup(self) -> None:
+        """Build the model and discover MCP tools concurrently, then the graph."""
+        self.model, self.tools = await asyncio.gather(
+            asyncio.to_thread(self._build_model),
+            asyncio.wrap_future(
+                asyncio.run_coroutine_threadsafe(
+                    mcp_tools(self._get_client, self._close_client), _loop
+                )
+            ),
+        )
+
+        from langgraph.checkpoint.memory import MemorySaver
+        from langgraph.prebuilt import create_react_agent
+
+        self.graph = create_react_agent(
+            self.model,
+            tools=self.tools,
+            checkpointer=MemorySaver(),
+            prompt=self.SYSTEM_INSTRUCTION,
+        )
+
+    def _build_model(self):
         model_source = os.getenv('model_source', 'google')
         if model_source == 'openai':
-            self.model = ChatOpenAI(
+            from langchain_openai import ChatOpenAI
+
+            return ChatOpenAI(
                 model='gpt-4o-mini',
                 openai_api_key=os.getenv('OPENAI_API_KEY'),
                 temperature=0.7,
             )
         elif model_source == 'google':
-            self.model = ChatGoogleGenerativeAI(model='gemini-pro')
+            from langchain_google_genai import ChatGoogleGenerativeAI
+
+            return ChatGoogleGenerativeAI(model='gemini-pro')
         else:
-            self.model = ChatOpenAI(
+            from langchain_openai import ChatOpenAI
+
+            return ChatOpenAI(
                 model=os.getenv('TOOL_LLM_NAME'),
                 openai_api_key=os.getenv('API_KEY', 'EMPTY'),
                 openai_api_base=os.getenv('TOOL_LLM_URL'),
                 temperature=0,
             )
-        
-        self.tools = asyncio.run(mcp_tools(mcp_server_url))
 
-        self.graph = create_react_agent(
-            self.model,
-            tools=self.tools,
-            checkpointer=memory,
-            prompt=self.SYSTEM_INSTRUCTION,
-            response_format=(self.FORMAT_INSTRUCTION, ResponseFormat),
+    async def _get_client(self) -> 'Client':
+        """Return the shared MCP client, (re)connecting it when needed."""
+        async with self._mcp_client_lock:
+            if self._mcp_client is not None and not self._mcp_client.is_connected():
+                await self._drop_client(self._mcp_client)
+            if self._mcp_client is None:
+                from fastmcp import Client
+
+                client = Client(self.mcp_server_url, timeout=30.0)
+                await client.__aenter__()
+                self._mcp_client = client
+            return self._mcp_client
+
+    async def _drop_client(self, client: 'Client') -> None:
+        # Caller holds the lock. A broken session may fail to close cleanly;
+        # it is discarded either way.
+        if self._mcp_client is client:
+            self._mcp_client = None
+        try:
+            await client.__aexit__(None, None, None)
+        except Exception:
+            pass
+
+    async def _close_client(self, client: 'Client | None' = None) -> None:
+        """Close and drop ``client`` (default: the current one) if still shared."""
+        async with self._mcp_client_lock:
+            if client is None:
+                client = self._mcp_client
+            if client is not None and client is self._mcp_client:
+                await self._drop_client(client)
+
+    async def close(self) -> None:
+        """Close the shared MCP client if it has been opened."""
+        await asyncio.wrap_future(
+            asyncio.run_coroutine_threadsafe(self._close_client(), _loop)
         )
 
     async def stream(self, query, context_id) -> AsyncIterable[dict[str, Any]]:
         inputs = {'messages': [('user', query)]}
         config = {'configurable': {'thread_id': context_id}}
 
-        for item in self.graph.stream(inputs, config, stream_mode='values'):
-            message = item['messages'][-1]
+        async for msg_chunk, metadata in self.graph.astream(
+            inputs, config, stream_mode='messages'
+        ):
             if (
-                isinstance(message, AIMessage)
-                and message.tool_calls
-                and len(message.tool_calls) > 0
+                isinstance(msg_chunk, AIMessageChunk)
+                and isinstance(msg_chunk.content, str)
+                and msg_chunk.content
             ):
                 yield {
                     'is_task_complete': False,
                     'require_user_input': False,
-                    'content': 'Checking the weather...',
-                }
-            elif isinstance(message, ToolMessage):
-                yield {
-                    'is_task_complete': False,
-                    'require_user_input': False,
-                    'content': 'Processing weather data..',
+                    'content': msg_chunk.content,
+                    'delta': True,
+                    'step': metadata.get('langgraph_step'),
                 }
 
-        yield self.get_agent_response(config)
+        yield await self.get_agent_response(config)
 
-    def get_agent_response(self, config):
+    async def get_agent_response(self, config):
         current_state = self.graph.get_state(config)
-        structured_response = current_state.values.get('structured_response')
+        messages = current_state.values.get('messages', [])
+        message = messages[-1] if messages else None
+
+        # A plain final answer backed by a tool call in this turn is reported
+        # as completed as-is; replies that skipped the tools or look like a
+        # question or a failure pay for a second LLM call.
+        if (
+            _called_tool_this_turn(messages)
+            and isinstance(message, AIMessage)
+            and not message.tool_calls
+            and isinstance(message.content, str)
+            and message.content
+            and not _NEEDS_STATUS_CHECK.search(message.content)
+        ):
+            return {
+                'is_task_complete': True,
+                'require_user_input': False,
+                'content': message.content,
+            }
+
+        structured_response = None
+        if messages:
+            structured_response = await self.model.with_structured_output(
+                ResponseFormat
+            ).ainvoke([SystemMessage(content=self.FORMAT_INSTRUCTION), *messages])
+
         if structured_response and isinstance(
             structured_response, ResponseFormat
         ):
@@ -1,6 +1,8 @@
 
 import logging
 
+from uuid import uuid4
+
 from a2a.server.agent_execution import AgentExecutor, RequestContext
 from a2a.server.events import EventQueue
 from a2a.server.tasks import TaskUpdater
@@ -29,7 +31,8 @@ class WeatherAgentExecutor(AgentExecutor):
     """Weather AgentExecutor Example."""
 
     def __init__(self, mcp_server_url: str):
-        self.agent = WeatherAgent(mcp_server_url)
+        self.mcp_server_url = mcp_server_url
+        self.agent: WeatherAgent | None = None
 
     async def execute(
         self,
@@ -46,21 +49,39 @@ class WeatherAgentExecutor(AgentExecutor):
             task = new_task(context.message)  # type: ignore
             await event_queue.enqueue_event(task)
         updater = TaskUpdater(event_queue, task.id, task.context_id)
+        # Token deltas are streamed as chunks of a single artifact rather than
+        # one status message per token. Each LLM step starts the artifact
+        # afresh, and the final reply replaces and closes it.
+        artifact_id = str(uuid4())
+        streamed = False
+        streamed_step = None
         try:
+            await updater.start_work()
             async for item in self.agent.stream(query, task.context_id):
                 is_task_complete = item['is_task_complete']
                 require_user_input = item['require_user_input']
 
                 if not is_task_complete and not require_user_input:
-                    await updater.update_status(
-                        TaskState.working,
-                        new_agent_text_message(
-                            item['content'],
-                            task.context_id,
-                            task.id,
-                        ),
+                    step = item.get('step')
+                    await updater.add_artifact(
+                        [Part(root=TextPart(text=item['content']))],
+                        artifact_id=artifact_id,
+                        name='weather_result',
+                        append=streamed and step == streamed_step,
+                        last_chunk=False,
                     )
+                    streamed, streamed_step = True, step
                 elif require_user_input:
+                    # The streamed tokens are not a result; overwrite them so
+                    # the artifact matches the status message.
+                    if streamed:
+                        await updater.add_artifact(
+                            [Part(root=TextPart(text=item['content']))],
+                            artifact_id=artifact_id,
+                            name='weather_result',
+                            append=False,
+                            last_chunk=True,
+                        )
                     await updater.update_status(
                         TaskState.input_required,
                         new_agent_text_message(
@@ -74,7 +95,10 @@ class WeatherAgentExecutor(AgentExecutor):
                 else:
                     await updater.add_artifact(
                         [Part(root=TextPart(text=item['content']))],
+                        artifact_id=artifact_id,
                         name='weather_result',
+                        append=False,
+                        last_chunk=True,
                     )
                     await updater.complete()
                     break
@@ -83,6 +107,15 @@ class WeatherAgentExecutor(AgentExecutor):
             logger.error(f'An error occurred while streaming the response: {e}')
             raise ServerError(error=InternalError()) from e
 
+    async def setup(self) -> None:
+        """Connect the agent to its model and MCP server on server startup."""
+        self.agent = await WeatherAgent.create(self.mcp_server_url)
+
+    async def close(self) -> None:
+        """Release the agent's MCP connection on server shutdown."""
+        if self.agent is not None:
+            await self.agent.close()
+
     def _validate_request(self, context: RequestContext) -> bool:
         return False
 
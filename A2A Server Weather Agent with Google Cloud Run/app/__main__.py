@@ -1,13 +1,13 @@
 
+import argparse
+import contextlib
 import logging
 import os
 import sys
 
-import click
 import httpx
 import uvicorn
 
-from a2a.server.apps import A2AStarletteApplication
 from a2a.server.request_handlers import DefaultRequestHandler
 from a2a.server.tasks import (
     BasePushNotificationSender,
@@ -23,6 +23,7 @@ from dotenv import load_dotenv
 
 from app.agent import WeatherAgent
 from app.agent_executor import WeatherAgentExecutor
+from app.server import WeatherAgentApplication
 
 
 load_dotenv()
@@ -31,28 +32,34 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+# uvloop is not available on Windows; fall back to uvicorn's defaults there.
+UVICORN_LOOP_KWARGS = (
+    {'loop': 'uvloop', 'http': 'httptools'} if sys.platform != 'win32' else {}
+)
+
+
 class MissingAPIKeyError(Exception):
     """Exception for missing API key."""
 
 
-@click.command()
-@click.option('--host', 'host', default='localhost')
-@click.option('--port', 'port', default=8080)
 def main(host, port):
     """Starts the Weather Agent server."""
     try:
         mcp_server_url = os.getenv('MCP_SERVER_URL')
+        model_source = os.getenv('model_source', 'google')
+        host_override = os.getenv('HOST_OVERRIDE')
+
         if not mcp_server_url:
             raise MissingAPIKeyError(
                 'MCP_SERVER_URL environment variable not set.'
             )
 
-        if os.getenv('model_source', 'google') == 'openai':
+        if model_source == 'openai':
             if not os.getenv('OPENAI_API_KEY'):
                 raise MissingAPIKeyError(
                     'OPENAI_API_KEY environment variable not set.'
                 )
-        elif os.getenv('model_source', 'google') == 'google':
+        elif model_source == 'google':
             if not os.getenv('GOOGLE_API_KEY'):
                 raise MissingAPIKeyError(
                     'GOOGLE_API_KEY environment variable not set.'
@@ -75,7 +82,6 @@ def main(host, port):
             tags=['weather', 'forecast'],
             examples=['What is the weather in London?', 'Give me a 5-day forecast for New York'],
         )
-        host_override = os.getenv('HOST_OVERRIDE')
         agent_card_url = host_override if host_override else f'http://{host}:{port}/'
 
         agent_card = AgentCard(
@@ -90,21 +96,52 @@ def main(host, port):
         )
 
 
-        httpx_client = httpx.AsyncClient()
+        # Push notifications to the same callback URLs reuse pooled
+        # connections instead of paying a TLS handshake each time.
+        httpx_client = httpx.AsyncClient(
+            http2=True,
+            timeout=httpx.Timeout(10.0, connect=3.0),
+            limits=httpx.Limits(
+                max_connections=int(os.getenv('PUSH_MAX_CONN', '200')),
+                max_keepalive_connections=int(
+                    os.getenv('PUSH_MAX_KEEPALIVE', '50')
+                ),
+                keepalive_expiry=30.0,
+            ),
+        )
         push_config_store = InMemoryPushNotificationConfigStore()
         push_sender = BasePushNotificationSender(httpx_client=httpx_client,
                         config_store=push_config_store)
+        agent_executor = WeatherAgentExecutor(mcp_server_url)
         request_handler = DefaultRequestHandler(
-            agent_executor=WeatherAgentExecutor(mcp_server_url),
+            agent_executor=agent_executor,
             task_store=InMemoryTaskStore(),
             push_config_store=push_config_store,
             push_sender= push_sender
         )
-        server = A2AStarletteApplication(
+        server = WeatherAgentApplication(
             agent_card=agent_card, http_handler=request_handler
         )
 
-        uvicorn.run(server.build(), host=host, port=port)
+        # The agent connects to its model and MCP server on startup.
+        # uvicorn turns Cloud Run's SIGTERM into a graceful shutdown, which
+        # runs the cleanup below before the process exits.
+        @contextlib.asynccontextmanager
+        async def lifespan(app):
+            await agent_executor.setup()
+            try:
+                yield
+            finally:
+                await agent_executor.close()
+                await httpx_client.aclose()
+
+        uvicorn.run(
+            server.build(lifespan=lifespan),
+            host=host,
+            port=port,
+            log_level='info',
+            **UVICORN_LOOP_KWARGS,
+        )
 
     except MissingAPIKeyError as e:
         logger.error(f'Error: {e}')
@@ -115,4 +152,10 @@ def main(host, port):
 
 
 if __name__ == '__main__':
-    main()
+    parser = argparse.ArgumentParser(description='Starts the Weather Agent server.')
+    # HOST is a local-only convenience: Cloud Run sets only PORT, and the
+    # container passes --host explicitly.
+    parser.add_argument('--host', default=os.getenv('HOST', 'localhost'))
+    parser.add_argument('--port', type=int, default=int(os.getenv('PORT', '8080')))
+    args = parser.parse_args()
+    main(args.host, args.port)
@@ -0,0 +1,61 @@
+
+from collections.abc import AsyncGenerator
+from typing import Any
+
+import orjson
+
+from a2a.extensions.common import HTTP_EXTENSION_HEADER
+from a2a.server.apps import A2AStarletteApplication
+from a2a.server.context import ServerCallContext
+from a2a.types import JSONRPCErrorResponse
+from a2a.utils.constants import AGENT_CARD_WELL_KNOWN_PATH
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+
+
+class ORJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson instead of the stdlib encoder."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content)
+
+
+class WeatherAgentApplication(A2AStarletteApplication):
+    """A2AStarletteApplication that encodes JSON-RPC responses with orjson.
+
+    The agent card does not change after startup, so it is serialized once
+    and served as raw bytes.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self._agent_card_bytes = orjson.dumps(
+            self.agent_card.model_dump(
+                mode='json', exclude_none=True, by_alias=True
+            )
+        )
+
+    async def _handle_get_agent_card(self, request: Request) -> Response:
+        # A card modifier can change the card per request, and the
+        # deprecated path logs a warning; leave both to the SDK.
+        if self.card_modifier or request.url.path != AGENT_CARD_WELL_KNOWN_PATH:
+            return await super()._handle_get_agent_card(request)
+        return Response(
+            content=self._agent_card_bytes, media_type='application/json'
+        )
+
+    def _create_response(
+        self, context: ServerCallContext, handler_result: Any
+    ) -> Response:
+        if isinstance(handler_result, AsyncGenerator):
+            return super()._create_response(context, handler_result)
+
+        headers = {}
+        if exts := context.activated_extensions:
+            headers[HTTP_EXTENSION_HEADER] = ', '.join(sorted(exts))
+        if not isinstance(handler_result, JSONRPCErrorResponse):
+            handler_result = handler_result.root
+        return ORJSONResponse(
+            handler_result.model_dump(mode='json', exclude_none=True),
+            headers=headers,
+        )
@@ -0,0 +1,106 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from app.agent import ResponseFormat, WeatherAgent
+
+
+class _StubGraph:
+    def __init__(self, messages):
+        self._messages = messages
+
+    def get_state(self, config):
+        return SimpleNamespace(values={'messages': self._messages})
+
+
+class _StubModel:
+    """Records structured-output calls and answers with a fixed status."""
+
+    def __init__(self, response):
+        self.response = response
+        self.calls = 0
+
+    def with_structured_output(self, schema):
+        return self
+
+    async def ainvoke(self, messages):
+        self.calls += 1
+        return self.response
+
+
+def _agent(messages, response=None):
+    agent = WeatherAgent('http://localhost:8080/mcp')
+    agent.graph = _StubGraph(messages)
+    agent.model = _StubModel(
+        response
+        or ResponseFormat(status='input_required', message='Which city?')
+    )
+    return agent
+
+
+def _tool_turn(reply):
+    return [
+        HumanMessage('Weather in Paris?'),
+        AIMessage(
+            '',
+            tool_calls=[
+                {
+                    'name': 'get_current_weather',
+                    'args': {'location': 'Paris'},
+                    'id': 'call-1',
+                }
+            ],
+        ),
+        ToolMessage('Paris: 21°C, clear sky', tool_call_id='call-1'),
+        AIMessage(reply),
+    ]
+
+
+def test_plain_answer_after_tool_call_skips_structured_pass():
+    agent = _agent(_tool_turn('It is 21°C and clear in Paris.'))
+
+    result = asyncio.run(agent.get_agent_response({}))
+
+    assert result == {
+        'is_task_complete': True,
+        'require_user_input': False,
+        'content': 'It is 21°C and clear in Paris.',
+    }
+    assert agent.model.calls == 0
+
+
+@pytest.mark.parametrize(
+    'reply',
+    [
+        'Please provide a city name.',
+        'Let me know which London you mean.',
+        'Which city would you like the weather for?',
+    ],
+)
+def test_clarification_reply_uses_structured_pass(reply):
+    agent = _agent(_tool_turn(reply))
+
+    result = asyncio.run(agent.get_agent_response({}))
+
+    assert result['require_user_input'] is True
+    assert agent.model.calls == 1
+
+
+def test_reply_without_tool_call_uses_structured_pass():
+    agent = _agent(
+        [
+            HumanMessage('What is the weather like?'),
+            AIMessage('I need a location to look that up.'),
+        ]
+    )
+
+    result = asyncio.run(agent.get_agent_response({}))
+
+    assert result == {
+        'is_task_complete': False,
+        'require_user_input': True,
+        'content': 'Which city?',
+    }
+    assert agent.model.calls == 1
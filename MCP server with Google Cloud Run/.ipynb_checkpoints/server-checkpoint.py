@@ -9,10 +9,13 @@ import asyncio
 import logging
 import os
 import json
-import requests
+import random
 from typing import List, Dict
 
+import httpx
+from cachetools import TTLCache
 from fastmcp import FastMCP
+from fastmcp.exceptions import ToolError
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(format="[%(levelname)s]: %(message)s", level=logging.INFO)
@@ -28,8 +31,81 @@ if not WEATHER_API_KEY:
 
 WEATHER_BASE_URL = "http://api.openweathermap.org/data/2.5"
 
+# Per-attempt timeouts, and the total time one request may take across all
+# retries. The budget stays below the agent's 20 s MCP call timeout, so a
+# retried request can still answer the tool call that triggered it.
+OWM_TIMEOUT = 10.0
+OWM_CONNECT_TIMEOUT = 3.0
+OWM_RETRY_BUDGET = 15.0
+
+# Shared connection pool so concurrent tool calls reuse keep-alive connections.
+# Pool size can be tuned per Cloud Run service via OWM_MAX_CONNECTIONS.
+_http = httpx.AsyncClient(
+    base_url=WEATHER_BASE_URL,
+    timeout=httpx.Timeout(OWM_TIMEOUT, connect=OWM_CONNECT_TIMEOUT),
+    limits=httpx.Limits(
+        max_connections=int(os.getenv("OWM_MAX_CONNECTIONS", "200")),
+        max_keepalive_connections=int(os.getenv("OWM_MAX_KEEPALIVE", "50")),
+        keepalive_expiry=30.0,
+    ),
+)
+
+# One cache per endpoint: current conditions go stale much faster than the
+# 3-hourly forecast. The agent caches tool results for another 10 s / 5 min on
+# top of these, so together the layers serve data at most 1 / 30 minutes old.
+_weather_caches: Dict[str, TTLCache] = {
+    "weather": TTLCache(maxsize=512, ttl=50),
+    "forecast": TTLCache(maxsize=512, ttl=1500),
+}
+
+async def _get_with_retry(url: str, params: dict, attempts: int = 3) -> httpx.Response:
+    """
+    GET from OpenWeatherMap, retrying connection errors and 5xx responses with
+    jittered exponential backoff. Client errors (e.g. unknown city) fail fast.
+
+    Attempts and backoff together never exceed OWM_RETRY_BUDGET seconds.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + OWM_RETRY_BUDGET
+    for i in range(attempts):
+        remaining = deadline - loop.time()
+        timeout = httpx.Timeout(
+            min(OWM_TIMEOUT, remaining), connect=min(OWM_CONNECT_TIMEOUT, remaining)
+        )
+        try:
+            response = await _http.get(url, params=params, timeout=timeout)
+            response.raise_for_status()
+            return response
+        except (httpx.TransportError, httpx.HTTPStatusError) as e:
+            delay = 0.1 * (2 ** i) + random.random() * 0.05
+            if (
+                i == attempts - 1
+                or loop.time() + delay >= deadline
+                or (isinstance(e, httpx.HTTPStatusError) and e.response.status_code < 500)
+            ):
+                raise
+            logger.warning(f"Retrying OpenWeatherMap request to {url} after: {e}")
+            await asyncio.sleep(delay)
+
+async def _fetch_weather_data(endpoint: str, location: str) -> dict:
+    """
+    Fetch the OpenWeatherMap JSON for a location, cached per endpoint
+    (50 s for current weather, 25 minutes for forecasts).
+
+    Failed requests raise and are therefore never cached.
+    """
+    cache = _weather_caches[endpoint]
+    if location in cache:
+        return cache[location]
+
+    params = {"q": location, "appid": WEATHER_API_KEY, "units": "metric"}
+    response = await _get_with_retry(f"/{endpoint}", params)
+    data = response.json()
+    cache[location] = data
+    return data
+
 @mcp.tool()
-def get_current_weather(location: str) -> dict:
+async def get_current_weather(location: str) -> dict:
     """
     Get current weather for a specific location using OpenWeatherMap API 2.5.
     
@@ -38,19 +114,24 @@ def get_current_weather(location: str) -> dict:
         
     Returns:
         Dictionary with current weather information
+
+    Raises:
+        ToolError: If the weather could not be retrieved.
     """
     logger.info(f">>> 🛠️ Tool: 'get_current_weather' called for location '{location}'")
     
     # Use the internal helper function
-    result = _get_weather_data(location)
-    
-    if "error" not in result:
-        logger.info(f"Weather data retrieved for {location}: {result['temperature']}°C")
+    result = await _get_weather_data(location)
     
+    if "error" in result:
+        logger.error(result["error"])
+        raise ToolError(result["error"])
+
+    logger.info(f"Weather data retrieved for {location}: {result['temperature']}°C")
     return result
 
 @mcp.tool()
-def get_weather_forecast(location: str, days: int = 3) -> dict:
+async def get_weather_forecast(location: str, days: int = 3) -> dict:
     """
     Get weather forecast for a specific location using OpenWeatherMap API 2.5.
     
@@ -60,34 +141,28 @@ def get_weather_forecast(location: str, days: int = 3) -> dict:
         
     Returns:
         Dictionary with forecast information
+
+    Raises:
+        ToolError: If the forecast could not be retrieved.
     """
     logger.info(f">>> 🛠️ Tool: 'get_weather_forecast' called for location '{location}' and {days} days")
     
     try:
-        url = f"{WEATHER_BASE_URL}/forecast"
-        params = {
-            "q": location,
-            "appid": WEATHER_API_KEY,
-            "units": "metric"
-        }
-        
-        response = requests.get(url, params=params)
-        response.raise_for_status()
-        data = response.json()
+        data = await _fetch_weather_data("forecast", location)
         
         # Process forecast data
+        # Entries come in 3-hour steps, so every 8th one starts a new day.
+        step = 8
+        items = data["list"]
         daily_forecasts = []
-        processed_dates = set()
         
-        for item in data["list"]:
-            date = item["dt_txt"].split()[0]
-            if date not in processed_dates and len(daily_forecasts) < days:
-                daily_forecasts.append({
-                    "date": date,
-                    "temperature": item["main"]["temp"],
-                    "description": item["weather"][0]["description"]
-                })
-                processed_dates.add(date)
+        for i in range(0, min(days * step, len(items)), step):
+            item = items[i]
+            daily_forecasts.append({
+                "date": item["dt_txt"][:10],
+                "temperature": item["main"]["temp"],
+                "description": item["weather"][0]["description"]
+            })
         
         result = {
             "location": location,
@@ -99,44 +174,40 @@ def get_weather_forecast(location: str, days: int = 3) -> dict:
         
     except Exception as e:
         logger.error(f"Failed to get forecast for {location}: {str(e)}")
-        return {"error": f"Failed to get forecast for {location}: {str(e)}"}
+        raise ToolError(f"Failed to get forecast for {location}: {str(e)}")
 
-def _get_weather_data(location: str) -> dict:
+async def _get_weather_data(location: str) -> dict:
     """
     Internal helper function to get weather data (not exposed as MCP tool)
     """
     try:
-        url = f"{WEATHER_BASE_URL}/weather"
-        params = {
-            "q": location,
-            "appid": WEATHER_API_KEY,
-            "units": "metric"
-        }
-        
-        response = requests.get(url, params=params)
-        response.raise_for_status()
-        data = response.json()
+        data = await _fetch_weather_data("weather", location)
+        main = data["main"]
         
         return {
             "location": location,
-            "temperature": data["main"]["temp"],
-            "feels_like": data["main"]["feels_like"],
-            "humidity": data["main"]["humidity"],
+            "temperature": main["temp"],
+            "feels_like": main["feels_like"],
+            "humidity": main["humidity"],
             "description": data["weather"][0]["description"],
             "wind_speed": data["wind"]["speed"],
-            "pressure": data["main"]["pressure"]
+            "pressure": main["pressure"]
         }
         
     except Exception as e:
         return {"error": f"Failed to get weather for {location}: {str(e)}"}
 
-if __name__ == "__main__":
-    logger.info(f"🚀 MCP server started on port {os.getenv('PORT', 8080)}")
-    # Could also use 'sse' transport, host="0.0.0.0" required for Cloud Run.
-    asyncio.run(
-        mcp.run_async(
+async def main():
+    try:
+        # Could also use 'sse' transport, host="0.0.0.0" required for Cloud Run.
+        await mcp.run_async(
             transport="streamable-http",
             host="0.0.0.0",
             port=os.getenv("PORT", 8080),
         )
-    )
\ No newline at end of file
+    finally:
+        await _http.aclose()
+
+if __name__ == "__main__":
+    logger.info(f"🚀 MCP server started on port {os.getenv('PORT', 8080)}")
+    asyncio.run(main())
\ No newline at end of file
@@ -20,11 +20,14 @@ def test_server_health():
     print("=" * 60)
     print(f"Server URL: {server_url}")
     print()
+
+    # Reuse one connection for all probes instead of a TLS handshake per request
+    session = requests.Session()
     
     # Test 1: Basic connectivity
     print("🔍 Test 1: Basic server connectivity...")
     try:
-        response = requests.get(f"{server_url}/mcp/", timeout=10)
+        response = session.get(f"{server_url}/mcp/", timeout=10)
         print(f"   Status Code: {response.status_code}")
         print(f"   Headers: {dict(response.headers)}")
         if response.text:
@@ -57,7 +60,7 @@ def test_server_health():
             }
         }
         
-        response = requests.post(
+        response = session.post(
             f"{server_url}/mcp/",
             headers=headers,
             json=initialize_request,
@@ -80,6 +83,8 @@ def test_server_health():
     except Exception as e:
         print(f"   ❌ MCP Initialize failed: {e}")
     
+    session.close()
+
     print()
     print("🎉 Basic connectivity tests completed!")
     print("=" * 60)
@@ -8,36 +8,47 @@ Based on Google Cloud's official MCP server pattern.
 import asyncio
 import logging
 import os
-import requests
+import random
 from typing import List, Dict, Optional
 
+import httpx
+import msgspec
+from cachetools import TTLCache
 from fastmcp import FastMCP
-from pydantic import BaseModel
+from fastmcp.exceptions import ToolError
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(format="[%(levelname)s]: %(message)s", level=logging.INFO)
 
 mcp = FastMCP("Weather Intelligence MCP Server")
 
-# --- Pydantic Models for Data Structuring ---
+# --- OpenWeatherMap Response Structs ---
+# Only the fields the tools use; msgspec skips everything else while decoding.
 
-class CurrentWeather(BaseModel):
-    location: str
-    temperature: float
+class OWMMain(msgspec.Struct):
+    temp: float
     feels_like: float
     humidity: int
-    description: str
-    wind_speed: float
     pressure: int
 
-class ForecastItem(BaseModel):
-    date: str
-    temperature: float
+class OWMWeather(msgspec.Struct):
     description: str
 
-class WeatherForecast(BaseModel):
-    location: str
-    forecast: List[ForecastItem]
+class OWMWind(msgspec.Struct):
+    speed: float
+
+class OWMCurrentResponse(msgspec.Struct):
+    main: OWMMain
+    weather: List[OWMWeather]
+    wind: OWMWind
+
+class OWMForecastItem(msgspec.Struct):
+    dt_txt: str
+    main: OWMMain
+    weather: List[OWMWeather]
+
+class OWMForecastResponse(msgspec.Struct):
+    list: List[OWMForecastItem]
 
 # --- MCP Server Configuration ---
 
@@ -49,10 +60,85 @@ if not WEATHER_API_KEY:
 
 WEATHER_BASE_URL = "http://api.openweathermap.org/data/2.5"
 
+# --- OpenWeatherMap Access ---
+
+# Per-attempt timeouts, and the total time one request may take across all
+# retries. The budget stays below the agent's 20 s MCP call timeout, so a
+# retried request can still answer the tool call that triggered it.
+OWM_TIMEOUT = 10.0
+OWM_CONNECT_TIMEOUT = 3.0
+OWM_RETRY_BUDGET = 15.0
+
+# Shared connection pool so concurrent tool calls reuse keep-alive connections.
+# Pool size can be tuned per Cloud Run service via OWM_MAX_CONNECTIONS.
+_http = httpx.AsyncClient(
+    base_url=WEATHER_BASE_URL,
+    timeout=httpx.Timeout(OWM_TIMEOUT, connect=OWM_CONNECT_TIMEOUT),
+    limits=httpx.Limits(
+        max_connections=int(os.getenv("OWM_MAX_CONNECTIONS", "200")),
+        max_keepalive_connections=int(os.getenv("OWM_MAX_KEEPALIVE", "50")),
+        keepalive_expiry=30.0,
+    ),
+)
+
+# One cache per endpoint: current conditions go stale much faster than the
+# 3-hourly forecast. The agent caches tool results for another 10 s / 5 min on
+# top of these, so together the layers serve data at most 1 / 30 minutes old.
+_weather_caches: Dict[str, TTLCache] = {
+    "weather": TTLCache(maxsize=512, ttl=50),
+    "forecast": TTLCache(maxsize=512, ttl=1500),
+}
+
+async def _get_with_retry(url: str, params: dict, attempts: int = 3) -> httpx.Response:
+    """
+    GET from OpenWeatherMap, retrying connection errors and 5xx responses with
+    jittered exponential backoff. Client errors (e.g. unknown city) fail fast.
+
+    Attempts and backoff together never exceed OWM_RETRY_BUDGET seconds.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + OWM_RETRY_BUDGET
+    for i in range(attempts):
+        remaining = deadline - loop.time()
+        timeout = httpx.Timeout(
+            min(OWM_TIMEOUT, remaining), connect=min(OWM_CONNECT_TIMEOUT, remaining)
+        )
+        try:
+            response = await _http.get(url, params=params, timeout=timeout)
+            response.raise_for_status()
+            return response
+        except (httpx.TransportError, httpx.HTTPStatusError) as e:
+            delay = 0.1 * (2 ** i) + random.random() * 0.05
+            if (
+                i == attempts - 1
+                or loop.time() + delay >= deadline
+                or (isinstance(e, httpx.HTTPStatusError) and e.response.status_code < 500)
+            ):
+                raise
+            logger.warning(f"Retrying OpenWeatherMap request to {url} after: {e}")
+            await asyncio.sleep(delay)
+
+async def _fetch_weather_data(endpoint: str, location: str, response_type: type):
+    """
+    Fetch an OpenWeatherMap response for a location, decoded into response_type
+    and cached per endpoint (50 s for current weather, 25 minutes for forecasts).
+
+    Failed requests raise and are therefore never cached.
+    """
+    cache = _weather_caches[endpoint]
+    if location in cache:
+        return cache[location]
+
+    params = {"q": location, "appid": WEATHER_API_KEY, "units": "metric"}
+    response = await _get_with_retry(f"/{endpoint}", params)
+    data = msgspec.json.decode(response.content, type=response_type)
+    cache[location] = data
+    return data
+
 # --- Refactored MCP Tools ---
 
 @mcp.tool()
-def get_current_weather(location: str) -> str:
+async def get_current_weather(location: str) -> str:
     """
     Get current weather for a specific location and return it as a formatted string.
     
@@ -60,42 +146,32 @@ def get_current_weather(location: str) -> str:
         location: City name or location (e.g., "London", "New York", "Tokyo")
         
     Returns:
-        Formatted string with current weather information or an error message.
+        Formatted string with current weather information.
+
+    Raises:
+        ToolError: If the weather could not be retrieved.
     """
     logger.info(f">>> 🛠️ Tool: 'get_current_weather' called for location '{location}'")
     
     try:
-        url = f"{WEATHER_BASE_URL}/weather"
-        params = {"q": location, "appid": WEATHER_API_KEY, "units": "metric"}
-        response = requests.get(url, params=params)
-        response.raise_for_status()
-        data = response.json()
-
-        weather = CurrentWeather(
-            location=location,
-            temperature=data["main"]["temp"],
-            feels_like=data["main"]["feels_like"],
-            humidity=data["main"]["humidity"],
-            description=data["weather"][0]["description"].title(),
-            wind_speed=data["wind"]["speed"],
-            pressure=data["main"]["pressure"]
-        )
+        owm = await _fetch_weather_data("weather", location, OWMCurrentResponse)
+        main = owm.main
 
-        logger.info(f"Weather data retrieved for {location}: {weather.temperature}°C")
+        logger.info(f"Weather data retrieved for {location}: {main.temp}°C")
 
-        return f"""Current weather in {weather.location}:
-- Temperature: {weather.temperature}°C (feels like {weather.feels_like}°C)
-- Condition: {weather.description}
-- Humidity: {weather.humidity}%
-- Wind Speed: {weather.wind_speed} m/s
-- Pressure: {weather.pressure} hPa"""
+        return f"""Current weather in {location}:
+- Temperature: {main.temp}°C (feels like {main.feels_like}°C)
+- Condition: {owm.weather[0].description.title()}
+- Humidity: {main.humidity}%
+- Wind Speed: {owm.wind.speed} m/s
+- Pressure: {main.pressure} hPa"""
 
     except Exception as e:
         logger.error(f"Failed to get weather for {location}: {str(e)}")
-        return f"Error: Failed to get weather for {location}: {str(e)}"
+        raise ToolError(f"Failed to get weather for {location}: {str(e)}")
 
 @mcp.tool()
-def get_weather_forecast(location: str, days: int = 3) -> str:
+async def get_weather_forecast(location: str, days: int = 3) -> str:
     """
     Get weather forecast for a specific location and return it as a formatted string.
     
@@ -104,48 +180,42 @@ def get_weather_forecast(location: str, days: int = 3) -> str:
         days: Number of days to forecast (max 5)
         
     Returns:
-        Formatted string with forecast information or an error message.
+        Formatted string with forecast information.
+
+    Raises:
+        ToolError: If the forecast could not be retrieved.
     """
     logger.info(f">>> 🛠️ Tool: 'get_weather_forecast' called for location '{location}' and {days} days")
     
     try:
-        url = f"{WEATHER_BASE_URL}/forecast"
-        params = {"q": location, "appid": WEATHER_API_KEY, "units": "metric"}
-        response = requests.get(url, params=params)
-        response.raise_for_status()
-        data = response.json()
-
-        daily_forecasts = []
-        processed_dates = set()
-        for item in data["list"]:
-            date = item["dt_txt"].split()[0]
-            if date not in processed_dates and len(daily_forecasts) < days:
-                daily_forecasts.append(ForecastItem(
-                    date=date,
-                    temperature=item["main"]["temp"],
-                    description=item["weather"][0]["description"].title()
-                ))
-                processed_dates.add(date)
-
-        weather_forecast = WeatherForecast(location=location, forecast=daily_forecasts)
-
-        result_str = f"{len(weather_forecast.forecast)}-day weather forecast for {weather_forecast.location}:\n"
-        for day in weather_forecast.forecast:
-            result_str += f"- {day.date}: {day.temperature}°C, {day.description}\n"
+        owm = await _fetch_weather_data("forecast", location, OWMForecastResponse)
+
+        # Entries come in 3-hour steps, so every 8th one starts a new day.
+        step = 8
+        items = owm.list
+        daily_forecasts = [items[i] for i in range(0, min(days * step, len(items)), step)]
+
+        result_str = f"{len(daily_forecasts)}-day weather forecast for {location}:\n"
+        for item in daily_forecasts:
+            result_str += f"- {item.dt_txt[:10]}: {item.main.temp}°C, {item.weather[0].description.title()}\n"
         
         logger.info(f"Forecast data retrieved for {location}: {len(daily_forecasts)} days")
         return result_str
 
     except Exception as e:
         logger.error(f"Failed to get forecast for {location}: {str(e)}")
-        return f"Error: Failed to get forecast for {location}: {str(e)}"
+        raise ToolError(f"Failed to get forecast for {location}: {str(e)}")
 
-if __name__ == "__main__":
-    logger.info(f"🚀 MCP server started on port {os.getenv('PORT', 8080)}")
-    asyncio.run(
-        mcp.run_async(
+async def main():
+    try:
+        await mcp.run_async(
             transport="streamable-http",
             host="0.0.0.0",
             port=os.getenv("PORT", 8080),
         )
-    )
+    finally:
+        await _http.aclose()
+
+if __name__ == "__main__":
+    logger.info(f"🚀 MCP server started on port {os.getenv('PORT', 8080)}")
+    asyncio.run(main())